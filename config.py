@@ -18,6 +18,8 @@ CACHE_TTL_STATISTICS: Final[int] = 86400  # 24 hours for field stats
 CACHE_TTL_STUDY: Final[int] = 21600  # 6 hours for individual studies
 CACHE_TTL_SEARCH: Final[int] = 3600  # 1 hour for search results
 CACHE_MAX_SIZE: Final[int] = 1000  # Max cached items
+CACHE_MAX_TRANSLATIONS: Final[int] = 2048  # Max memoized query translations
+CACHE_MAX_DATES: Final[int] = 4096  # Max memoized parsed date strings
 
 # Default fields for different analysis depths
 FIELDS_SUMMARY: Final[list[str]] = [
@@ -55,6 +57,10 @@ FIELDS_STANDARD: Final[list[str]] = FIELDS_SUMMARY + [
     "CentralContactEMail",
 ]
 
+# Pre-joined forms for the API's pipe-separated "fields" parameter
+FIELDS_SUMMARY_JOINED: Final[str] = "|".join(FIELDS_SUMMARY)
+FIELDS_STANDARD_JOINED: Final[str] = "|".join(FIELDS_STANDARD)
+
 FIELDS_COMPREHENSIVE: Final[list[str]] = FIELDS_STANDARD + [
     "OrgStudyId",
     "SecondaryId",
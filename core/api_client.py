@@ -1,6 +1,7 @@
 """Async HTTP client for ClinicalTrials.gov API with caching and retry logic."""
 
 import asyncio
+import functools
 import hashlib
 import json
 from typing import Any
@@ -8,6 +9,14 @@ from typing import Any
 import aiohttp
 from cachetools import TTLCache
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is several times faster on large study pages
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 from config import (
     API_BASE_URL,
     API_TIMEOUT_SECONDS,
@@ -21,6 +30,13 @@ from config import (
 )
 
 
+def _canonical_json(data: Any) -> bytes:
+    """Serialize data as JSON with sorted keys, for building cache keys."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True).encode()
+
+
 class APIError(Exception):
     """Base exception for API errors."""
 
@@ -57,6 +73,8 @@ class ClinicalTrialsAPIClient:
         self._cache_statistics = TTLCache(maxsize=200, ttl=CACHE_TTL_STATISTICS)
         self._cache_studies = TTLCache(maxsize=CACHE_MAX_SIZE, ttl=CACHE_TTL_STUDY)
         self._cache_search = TTLCache(maxsize=CACHE_MAX_SIZE, ttl=CACHE_TTL_SEARCH)
+        # Requests currently on the wire, so concurrent cache misses share one fetch
+        self._inflight: dict[str, asyncio.Future] = {}
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create the HTTP session."""
@@ -79,8 +97,7 @@ class ClinicalTrialsAPIClient:
     def _get_cache_key(self, endpoint: str, params: dict[str, Any] | None) -> str:
         """Generate a cache key from endpoint and parameters."""
         key_data = {"endpoint": endpoint, "params": params or {}}
-        key_str = json.dumps(key_data, sort_keys=True)
-        return hashlib.md5(key_str.encode()).hexdigest()
+        return hashlib.md5(_canonical_json(key_data)).hexdigest()
 
     def _get_cache_for_endpoint(self, endpoint: str) -> TTLCache:
         """Get the appropriate cache based on endpoint type."""
@@ -119,10 +136,32 @@ class ClinicalTrialsAPIClient:
         cache = self._get_cache_for_endpoint(endpoint)
         cache_key = self._get_cache_key(endpoint, params)
 
+        if not use_cache:
+            return await self._request(endpoint, params)
+
         # Check cache first
-        if use_cache and cache_key in cache:
+        if cache_key in cache:
             return cache[cache_key]
 
+        # Join an identical request that is already in flight
+        pending = self._inflight.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._request(endpoint, params))
+            self._inflight[cache_key] = pending
+            pending.add_done_callback(functools.partial(self._finish_request, cache, cache_key))
+
+        # Shielded so one cancelled caller doesn't abort the fetch for the others
+        return await asyncio.shield(pending)
+
+    def _finish_request(self, cache: TTLCache, cache_key: str, task: asyncio.Future) -> None:
+        """Cache a finished in-flight request, even if all its callers were cancelled."""
+        self._inflight.pop(cache_key, None)
+        # exception() also marks a failure as retrieved when no caller is left
+        if not task.cancelled() and task.exception() is None:
+            cache[cache_key] = task.result()
+
+    async def _request(self, endpoint: str, params: dict[str, Any] | None) -> dict[str, Any]:
+        """Perform the HTTP request with retries, bypassing the caches."""
         session = await self._get_session()
         url = f"{API_BASE_URL}{endpoint}"
         last_error: Exception | None = None
@@ -154,13 +193,7 @@ class ClinicalTrialsAPIClient:
                         )
 
                     response.raise_for_status()
-                    data = await response.json()
-
-                    # Cache successful responses
-                    if use_cache:
-                        cache[cache_key] = data
-
-                    return data
+                    return await response.json(loads=_json_loads)
 
             except (APIValidationError, APINotFoundError):
                 raise  # Don't retry these
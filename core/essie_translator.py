@@ -4,9 +4,12 @@ Essie is the query language used by ClinicalTrials.gov API v2.
 This module provides rules-based translation from natural language queries.
 """
 
+import functools
 import re
 from typing import Any
 
+from config import CACHE_MAX_TRANSLATIONS
+
 
 # Field mappings for AREA[] expressions
 FIELD_MAPPINGS = {
@@ -87,10 +90,14 @@ class EssieTranslator:
             re.IGNORECASE,
         )
 
+    @functools.lru_cache(maxsize=CACHE_MAX_TRANSLATIONS)
     def translate(self, query: str) -> str:
         """
         Translate natural language query to Essie syntax.
 
+        Translation is a pure function of the query string, so results are
+        memoized; interactive sessions tend to repeat the same queries.
+
         Examples:
             "lung cancer AND pembrolizumab in phase 3"
             → 'AREA[Condition]"lung cancer" AND AREA[InterventionName]pembrolizumab AND AREA[Phase]PHASE3'
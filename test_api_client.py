@@ -0,0 +1,92 @@
+"""Tests for request coalescing in the API client."""
+
+import asyncio
+import gc
+
+from core.api_client import APIError, ClinicalTrialsAPIClient
+
+
+def _client_with_fake_request(release: asyncio.Event, calls: list, error: Exception | None = None):
+    """Client whose HTTP request waits for release, then returns or raises."""
+    client = ClinicalTrialsAPIClient()
+
+    async def fake_request(endpoint, params):
+        calls.append((endpoint, params))
+        await release.wait()
+        if error is not None:
+            raise error
+        return {"studies": [{"nctId": "NCT00000001"}]}
+
+    client._request = fake_request
+    return client
+
+
+async def test_concurrent_misses_share_one_request():
+    release, calls = asyncio.Event(), []
+    client = _client_with_fake_request(release, calls)
+
+    callers = [asyncio.create_task(client.get("/studies", {"query.term": "asthma"})) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert not client._inflight
+
+    # Served from the cache afterwards
+    assert await client.get("/studies", {"query.term": "asthma"}) is results[0]
+    assert len(calls) == 1
+
+
+async def test_cancelled_caller_does_not_abort_others():
+    release, calls = asyncio.Event(), []
+    client = _client_with_fake_request(release, calls)
+
+    cancelled = asyncio.create_task(client.get("/studies", {"query.term": "asthma"}))
+    waiting = asyncio.create_task(client.get("/studies", {"query.term": "asthma"}))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+
+    assert (await waiting)["studies"][0]["nctId"] == "NCT00000001"
+    assert cancelled.cancelled()
+    assert len(calls) == 1
+
+
+async def test_fetch_finishing_after_all_callers_cancelled_is_cached():
+    release, calls = asyncio.Event(), []
+    client = _client_with_fake_request(release, calls)
+
+    caller = asyncio.create_task(client.get("/studies", {"query.term": "asthma"}))
+    await asyncio.sleep(0)
+    pending = client._inflight[client._get_cache_key("/studies", {"query.term": "asthma"})]
+    caller.cancel()
+    release.set()
+    await asyncio.wait([pending])
+
+    assert not client._inflight
+    result = await client.get("/studies", {"query.term": "asthma"})
+    assert result["studies"][0]["nctId"] == "NCT00000001"
+    assert len(calls) == 1
+
+
+async def test_failure_after_all_callers_cancelled_is_retrieved():
+    release, calls = asyncio.Event(), []
+    client = _client_with_fake_request(release, calls, error=APIError("boom"))
+    loop = asyncio.get_running_loop()
+    reported = []
+    loop.set_exception_handler(lambda _, context: reported.append(context))
+
+    caller = asyncio.create_task(client.get("/studies", {"query.term": "asthma"}))
+    await asyncio.sleep(0)
+    pending = client._inflight[client._get_cache_key("/studies", {"query.term": "asthma"})]
+    caller.cancel()
+    release.set()
+    await asyncio.wait([pending])
+    del pending
+    gc.collect()
+
+    assert not reported
+    assert not client._inflight
+    assert not client._cache_search
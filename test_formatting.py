@@ -0,0 +1,39 @@
+"""Tests for CSV formatting."""
+
+import csv
+import io
+
+from utils.formatting import format_csv, format_csv_row
+
+TRIAL = {
+    "nct_id": "NCT00000001",
+    "title": 'Line one\r\nLine two\rLine three\nLine "four", end',
+    "status": "RECRUITING",
+    "phase": ["PHASE2", "PHASE3\r"],
+    "sponsor": "Acme",
+    "enrollment": 120,
+}
+
+EXPECTED = [
+    "NCT00000001",
+    'Line one\nLine two\nLine three\nLine "four", end',
+    "RECRUITING",
+    "PHASE2; PHASE3\n",
+    "Acme",
+    "120",
+]
+
+
+def test_format_csv_row_quotes_embedded_line_breaks():
+    row = format_csv_row(TRIAL)
+
+    assert "\r" not in row
+    assert list(csv.reader(io.StringIO(row))) == [EXPECTED]
+
+
+def test_format_csv_round_trips_rows_with_line_breaks():
+    fields = ["nct_id", "title", "status", "phase", "sponsor", "enrollment"]
+    document = format_csv([TRIAL, TRIAL], fields)
+
+    assert "\r" not in document
+    assert list(csv.reader(io.StringIO(document))) == [fields, EXPECTED, EXPECTED]
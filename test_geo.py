@@ -0,0 +1,66 @@
+"""Tests for the geographic helpers."""
+
+import math
+import random
+
+import pytest
+
+from utils.geo import EARTH_RADIUS_KM, nearest_distance_km
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """Reference great-circle distance without any bounding-box shortcuts."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def test_empty_points():
+    assert nearest_distance_km([], 42.36, -71.06, 100) is None
+
+
+def test_crosses_the_antimeridian():
+    expected = _haversine_km(0.0, 179.9, 0.0, -179.9)
+
+    assert nearest_distance_km([(0.0, -179.9)], 0.0, 179.9, 50) == pytest.approx(expected)
+    assert nearest_distance_km([(10.0, 179.9)], 10.0, -179.95, 50) == pytest.approx(
+        _haversine_km(10.0, -179.95, 10.0, 179.9)
+    )
+
+
+@pytest.mark.parametrize("center_lat", [89.5, -89.5, 90.0, 88.0])
+def test_points_near_the_poles(center_lat):
+    sign = 1 if center_lat > 0 else -1
+    points = [(sign * 89.5, 180.0), (sign * 89.0, -90.0), (sign * 88.5, 45.0)]
+    expected = min(_haversine_km(center_lat, 0.0, lat, lon) for lat, lon in points)
+
+    assert nearest_distance_km(points, center_lat, 0.0, 500) == pytest.approx(expected)
+
+
+def test_radius_edge_is_inclusive():
+    point = (42.0, -71.0)
+    distance = _haversine_km(42.36, -71.06, *point)
+
+    assert nearest_distance_km([point], 42.36, -71.06, distance) == pytest.approx(distance)
+    assert nearest_distance_km([point], 42.36, -71.06, distance - 1e-6) is None
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(500):
+        center = (rng.uniform(-90, 90), rng.uniform(-180, 180))
+        radius = rng.choice([5, 50, 500, 5000])
+        points = [
+            (max(-90.0, min(90.0, center[0] + rng.uniform(-10, 10))), rng.uniform(-180, 180))
+            for _ in range(20)
+        ]
+        within = [d for d in (_haversine_km(*center, *p) for p in points) if d <= radius]
+
+        result = nearest_distance_km(points, *center, radius)
+        if within:
+            assert result == pytest.approx(min(within))
+        else:
+            assert result is None
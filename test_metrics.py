@@ -0,0 +1,103 @@
+"""Tests for the trial metric helpers."""
+
+from datetime import date
+
+import pytest
+
+from utils import metrics
+from utils.metrics import _parse_partial_date
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2020", date(2020, 1, 1)),
+        ("2020-05", date(2020, 5, 1)),
+        ("2020-05-17", date(2020, 5, 17)),
+        ("2024-02-29", date(2024, 2, 29)),
+    ],
+)
+def test_parse_partial_date(value, expected):
+    assert _parse_partial_date(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "20",
+        "20200",
+        "2020-5",
+        "2020/05",
+        "2020-05-1",
+        "2020_05_17",
+        "2020-13",
+        "2020-00",
+        "2023-02-29",
+        "0000",
+        "abcd",
+        "２０２０",
+        "-2020",
+        "2020-05-17T00:00",
+    ],
+)
+def test_parse_partial_date_rejects_bad_input(value):
+    assert _parse_partial_date(value) is None
+
+
+def test_today_refreshes_after_a_minute(monkeypatch):
+    clock = [1000.0]
+    days = [date(2024, 12, 31)]
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return days[0]
+
+    monkeypatch.setattr(metrics, "date", FakeDate)
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(metrics, "_today_cache", (float("-inf"), date.min))
+
+    assert metrics._today() == date(2024, 12, 31)
+
+    # Midnight passes, but the cached date is kept for up to a minute
+    days[0] = date(2025, 1, 1)
+    clock[0] += 59
+    assert metrics._today() == date(2024, 12, 31)
+
+    clock[0] += 1
+    assert metrics._today() == date(2025, 1, 1)
+
+
+def _study(nct_id, **protocol):
+    return {"protocolSection": {"identificationModule": {"nctId": nct_id}, **protocol}}
+
+
+def test_extract_trial_columns_matches_summaries():
+    studies = [
+        _study(
+            "NCT00000001",
+            statusModule={"overallStatus": "RECRUITING", "startDateStruct": {"date": "2020-05"}},
+            designModule={"phases": ["PHASE2", "PHASE3"], "enrollmentInfo": {"count": 120, "type": "ESTIMATED"}},
+            sponsorCollaboratorsModule={"leadSponsor": {"name": "Acme", "class": "INDUSTRY"}},
+            conditionsModule={"conditions": ["Asthma"]},
+            armsInterventionsModule={"interventions": [{"name": "Drug A"}, {"type": "DRUG"}]},
+            contactsLocationsModule={"locations": [{"city": "Boston", "state": "Massachusetts", "country": "United States"}]},
+        ),
+        _study("NCT00000002"),
+        {**_study("NCT00000003", statusModule={"overallStatus": "COMPLETED"}), "hasResults": True},
+    ]
+
+    columns = metrics.extract_trial_columns(studies)
+    summaries = [metrics.extract_trial_summary(study) for study in studies]
+
+    assert list(columns) == list(summaries[0])
+    for name, column in columns.items():
+        assert column == [summary[name] for summary in summaries]
+
+
+def test_extract_trial_columns_empty():
+    columns = metrics.extract_trial_columns([])
+
+    assert list(columns) == list(metrics.extract_trial_summary({}))
+    assert all(column == [] for column in columns.values())
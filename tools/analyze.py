@@ -8,11 +8,7 @@ from core.models import AnalysisDepth, SimilarityDimension
 from config import FIELDS_SUMMARY, FIELDS_STANDARD, FIELDS_COMPREHENSIVE
 from utils.metrics import (
     extract_trial_summary,
-    compute_trial_maturity,
-    compute_enrollment_pace,
-    compute_completion_likelihood,
-    compute_days_since_start,
-    compute_days_to_completion,
+    compute_all_metrics,
 )
 from utils.formatting import format_eligibility
 
@@ -196,13 +192,7 @@ def _build_trial_analysis(
 
     # Computed metrics
     if compute_metrics:
-        analysis["key_metrics"] = {
-            "trial_maturity": compute_trial_maturity(study),
-            "enrollment_pace": compute_enrollment_pace(study),
-            "completion_likelihood": compute_completion_likelihood(study),
-            "days_since_start": compute_days_since_start(study),
-            "days_to_completion": compute_days_to_completion(study),
-        }
+        analysis["key_metrics"] = compute_all_metrics(study)
 
     # Results data
     if include_results and results_section:
@@ -5,7 +5,7 @@ from typing import Any
 from core.api_client import get_api_client, APIError
 from core.pagination import PaginationHandler
 from config import FIELDS_SUMMARY
-from utils.metrics import extract_trial_summary
+from utils.metrics import extract_trial_columns
 
 
 async def get_enrollment_intelligence(
@@ -108,33 +108,32 @@ async def get_enrollment_intelligence(
     by_sponsor: dict[str, int] = {}
     by_country: dict[str, int] = {}
 
-    trial_summaries = []
+    columns = extract_trial_columns(studies)
+    enrollment_column = [enrollment or 0 for enrollment in columns["enrollment"]]
 
-    for study in studies:
-        summary = extract_trial_summary(study)
-        trial_summaries.append(summary)
-
-        enrollment = summary.get("enrollment") or 0
+    for enrollment, phases, status, sponsor, locations in zip(
+        enrollment_column,
+        columns["phase"],
+        columns["status"],
+        columns["sponsor"],
+        columns["locations"],
+    ):
         if enrollment > 0:
             enrollments.append(enrollment)
 
         # By phase
-        phases = summary.get("phase") or ["N/A"]
-        for phase in phases:
+        for phase in phases or ["N/A"]:
             if phase not in by_phase:
                 by_phase[phase] = []
             by_phase[phase].append(enrollment)
 
         # By status
-        status = summary.get("status", "Unknown")
         by_status[status] = by_status.get(status, 0) + 1
 
         # By sponsor
-        sponsor = summary.get("sponsor", "Unknown")
         by_sponsor[sponsor] = by_sponsor.get(sponsor, 0) + 1
 
         # By country (from first location)
-        locations = summary.get("locations", [])
         if locations:
             country = locations[0].split(",")[-1].strip() if "," in locations[0] else locations[0]
             by_country[country] = by_country.get(country, 0) + 1
@@ -195,9 +194,9 @@ async def get_enrollment_intelligence(
     if include_capacity_analysis:
         recruiting_count = by_status.get("RECRUITING", 0)
         recruiting_enrollment = sum(
-            s.get("enrollment") or 0
-            for s in trial_summaries
-            if s.get("status") == "RECRUITING"
+            enrollment
+            for enrollment, status in zip(enrollment_column, columns["status"])
+            if status == "RECRUITING"
         )
 
         result["capacity_analysis"] = {
@@ -222,18 +221,18 @@ async def get_enrollment_intelligence(
         ]
 
         # Top trials by enrollment
-        top_trials = sorted(trial_summaries, key=lambda x: x.get("enrollment") or 0, reverse=True)[:10]
+        top_trials = sorted(range(len(studies)), key=enrollment_column.__getitem__, reverse=True)[:10]
 
         result["competitive_insights"] = {
             "dominant_sponsors": top_sponsors,
             "largest_trials": [
                 {
-                    "nct_id": t["nct_id"],
-                    "title": t["title"][:80],
-                    "enrollment": t.get("enrollment"),
-                    "sponsor": t.get("sponsor"),
+                    "nct_id": columns["nct_id"][i],
+                    "title": columns["title"][i][:80],
+                    "enrollment": columns["enrollment"][i],
+                    "sponsor": columns["sponsor"][i],
                 }
-                for t in top_trials
+                for i in top_trials
             ],
             "market_concentration": _estimate_concentration(by_sponsor),
         }
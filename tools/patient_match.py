@@ -1,14 +1,26 @@
 """Tool 3: match_patient_to_trials - Patient-centric trial matching."""
 
+import bisect
+import heapq
 import re
-from typing import Any
+from typing import Any, Iterator
 
 from core.api_client import get_api_client, APIError
 from core.pagination import PaginationHandler
 from core.models import MatchStrictness, EligibilityStatus, PatientProfile
-from config import FIELDS_STANDARD
+from config import FIELDS_STANDARD_JOINED, MAX_PAGE_SIZE
 from utils.metrics import extract_trial_summary
 from utils.formatting import format_eligibility
+from utils.geo import nearest_distance_km
+
+# Eligibility status by score band: <40, 40-59, 60-79, >=80
+_STATUS_THRESHOLDS = (40, 60, 80)
+_STATUS_BUCKETS = (
+    EligibilityStatus.LIKELY_INELIGIBLE,
+    EligibilityStatus.UNCLEAR,
+    EligibilityStatus.POSSIBLY_ELIGIBLE,
+    EligibilityStatus.LIKELY_ELIGIBLE,
+)
 
 
 async def match_patient_to_trials(
@@ -62,8 +74,9 @@ async def match_patient_to_trials(
     # Build search query
     params: dict[str, Any] = {
         "query.cond": primary_condition,
-        "fields": "|".join(FIELDS_STANDARD),
+        "fields": FIELDS_STANDARD_JOINED,
     }
+    adv_parts: list[str] = []
 
     # Status filter
     if must_be_recruiting:
@@ -72,6 +85,8 @@ async def match_patient_to_trials(
     # Location filter
     if latitude is not None and longitude is not None:
         params["filter.geo"] = f"distance({latitude},{longitude},{max_travel_distance_km}km)"
+        # Site coordinates are needed to compute real travel distances
+        params["fields"] = f"{FIELDS_STANDARD_JOINED}|LocationGeoPoint"
     elif location_country:
         location_parts = []
         if location_city:
@@ -82,15 +97,14 @@ async def match_patient_to_trials(
             location_parts.append(f'AREA[LocationCountry]"{location_country}"')
         
         if location_parts:
-            params["filter.advanced"] = "SEARCH[Location](" + " AND ".join(location_parts) + ")"
+            adv_parts.append("SEARCH[Location](" + " AND ".join(location_parts) + ")")
 
     # Phase filter
     if preferred_phases:
-        phase_filter = "(" + " OR ".join(f"AREA[Phase]{p.upper()}" for p in preferred_phases) + ")"
-        if "filter.advanced" in params:
-            params["filter.advanced"] += f" AND {phase_filter}"
-        else:
-            params["filter.advanced"] = phase_filter
+        adv_parts.append("(" + " OR ".join(f"AREA[Phase]{p.upper()}" for p in preferred_phases) + ")")
+
+    if adv_parts:
+        params["filter.advanced"] = " AND ".join(adv_parts)
 
     # Determine match strictness
     try:
@@ -103,6 +117,7 @@ async def match_patient_to_trials(
         response = await pagination.fetch_all_pages(
             query_params=params,
             max_results=limit * 3,  # Fetch extra for filtering/scoring
+            page_size=min(limit * 3, MAX_PAGE_SIZE),  # Single round trip where possible
             count_total=True,
         )
     except APIError as e:
@@ -112,47 +127,39 @@ async def match_patient_to_trials(
             "matched_trials": [],
         }
 
-    # Score each trial
-    matched_trials = []
-    patient_age_years = age
-    patient_gender = gender.upper()
+    # Score trials lazily and keep only the best `limit` (same order as a
+    # stable descending sort). Full match results (explanation, distance,
+    # next steps) are only built for the trials that make the cut.
+    scored_trials = _score_stream(
+        response.get("studies", []),
+        patient_age_years=age,
+        patient_gender=gender.upper(),
+        excluded_lower=frozenset(e.casefold() for e in excluded_interventions or []),
+        strictness=strictness,
+    )
+    top_trials = heapq.nlargest(limit, scored_trials, key=lambda x: x[0])
 
-    for study in response.get("studies", []):
-        summary = extract_trial_summary(study)
-        protocol = study.get("protocolSection", {})
-        eligibility_module = protocol.get("eligibilityModule", {})
-
-        # Calculate eligibility score
-        score, status, explanation, issues = _calculate_eligibility(
-            patient_age_years=patient_age_years,
-            patient_gender=patient_gender,
-            eligibility_module=eligibility_module,
-            excluded_interventions=excluded_interventions or [],
-            interventions=summary.get("interventions", []),
-            strictness=strictness,
-        )
-
-        # Apply strictness filter
-        if strictness == MatchStrictness.STRICT and status != EligibilityStatus.LIKELY_ELIGIBLE:
-            continue
-        elif strictness == MatchStrictness.BALANCED and status == EligibilityStatus.LIKELY_INELIGIBLE:
-            continue
+    # Lowercase the patient's location once rather than per trial site
+    city_lower = location_city.lower() if location_city else None
+    state_lower = location_state.lower() if location_state else None
+    country_lower = location_country.lower() if location_country else None
 
+    matched_trials = []
+    for score, status, explanation_parts, issues, summary, contacts_module in top_trials:
         # Calculate distance if location available
         distance_km = None
-        locations = protocol.get("contactsLocationsModule", {}).get("locations", [])
-        if locations and (location_city or location_country):
-            # Simple distance estimation based on matching location
-            for loc in locations:
-                if location_city and loc.get("city", "").lower() == location_city.lower():
-                    distance_km = 0
-                    break
-                elif location_state and loc.get("state", "").lower() == location_state.lower():
-                    distance_km = 50  # Approximate
-                    break
-                elif location_country and loc.get("country", "").lower() == location_country.lower():
-                    distance_km = 100  # Approximate
-                    break
+        locations = contacts_module.get("locations", [])
+        if locations and latitude is not None and longitude is not None:
+            distance_km = _nearest_site_km(locations, latitude, longitude, max_travel_distance_km)
+        if distance_km is None and locations and (city_lower or country_lower):
+            # Simple distance estimation based on the closest matching site,
+            # also used when no geocoded site is within range
+            if city_lower and city_lower in {loc.get("city", "").lower() for loc in locations}:
+                distance_km = 0
+            elif state_lower and state_lower in {loc.get("state", "").lower() for loc in locations}:
+                distance_km = 50  # Approximate
+            elif country_lower and country_lower in {loc.get("country", "").lower() for loc in locations}:
+                distance_km = 100  # Approximate
 
         # Build match result
         match_result = {
@@ -162,7 +169,7 @@ async def match_patient_to_trials(
         }
 
         if explain_matches:
-            match_result["eligibility_explanation"] = explanation
+            match_result["eligibility_explanation"] = _build_explanation(issues, explanation_parts)
             if issues:
                 match_result["potential_issues"] = issues
 
@@ -170,14 +177,10 @@ async def match_patient_to_trials(
             match_result["distance_km"] = distance_km
 
         # Add next steps
-        match_result["next_steps"] = _generate_next_steps(study, status)
+        match_result["next_steps"] = _generate_next_steps(contacts_module, status)
 
         matched_trials.append(match_result)
 
-    # Sort by match score
-    matched_trials.sort(key=lambda x: x["match_score"], reverse=True)
-    matched_trials = matched_trials[:limit]
-
     # Alternative suggestions if few matches
     alternative_conditions = []
     if len(matched_trials) < 5 and secondary_conditions:
@@ -217,15 +220,57 @@ async def match_patient_to_trials(
     return result
 
 
+def _score_stream(
+    studies: list[dict[str, Any]],
+    patient_age_years: int,
+    patient_gender: str,
+    excluded_lower: frozenset[str],
+    strictness: MatchStrictness,
+) -> Iterator[tuple[float, EligibilityStatus, list[str], list[str], dict[str, Any], dict[str, Any]]]:
+    """
+    Score studies for a patient, yielding those that pass the strictness filter.
+
+    Yields (score, status, explanation_parts, issues, summary, contacts_module)
+    tuples one at a time so the caller can keep just the top matches.
+    """
+    for study in studies:
+        summary = extract_trial_summary(study)
+        eligibility_module, contacts_module = _unpack_study(study)
+
+        # Calculate eligibility score
+        score, status, explanation_parts, issues = _calculate_eligibility(
+            patient_age_years=patient_age_years,
+            patient_gender=patient_gender,
+            eligibility_module=eligibility_module,
+            excluded_lower=excluded_lower,
+            interventions=summary.get("interventions", []),
+            strictness=strictness,
+        )
+
+        # Apply strictness filter
+        if strictness == MatchStrictness.STRICT and status != EligibilityStatus.LIKELY_ELIGIBLE:
+            continue
+        elif strictness == MatchStrictness.BALANCED and status == EligibilityStatus.LIKELY_INELIGIBLE:
+            continue
+
+        yield score, status, explanation_parts, issues, summary, contacts_module
+
+
 def _calculate_eligibility(
     patient_age_years: int,
     patient_gender: str,
     eligibility_module: dict[str, Any],
-    excluded_interventions: list[str],
+    excluded_lower: frozenset[str],
     interventions: list[str],
     strictness: MatchStrictness,
-) -> tuple[float, EligibilityStatus, str, list[str]]:
-    """Calculate eligibility score and status for a patient."""
+) -> tuple[float, EligibilityStatus, list[str], list[str]]:
+    """
+    Calculate eligibility score and status for a patient.
+
+    excluded_lower holds the patient's excluded interventions, casefolded once
+    per match call by the caller. Returns the met criteria rather than
+    a finished explanation; see _build_explanation.
+    """
     score = 100.0
     issues = []
     explanation_parts = []
@@ -246,6 +291,11 @@ def _calculate_eligibility(
     else:
         explanation_parts.append("Age requirement met")
 
+    # STRICT only keeps LIKELY_ELIGIBLE (score >= 80) trials and penalties
+    # never reverse, so stop as soon as a trial can no longer qualify
+    if strictness is MatchStrictness.STRICT and score < 80:
+        return score, EligibilityStatus.LIKELY_INELIGIBLE, explanation_parts, issues
+
     # Check sex eligibility
     trial_sex = eligibility_module.get("sex", "ALL").upper()
     if trial_sex != "ALL" and trial_sex != patient_gender:
@@ -254,11 +304,13 @@ def _calculate_eligibility(
     else:
         explanation_parts.append("Gender requirement met")
 
+    if strictness is MatchStrictness.STRICT and score < 80:
+        return score, EligibilityStatus.LIKELY_INELIGIBLE, explanation_parts, issues
+
     # Check excluded interventions
-    if excluded_interventions and interventions:
-        excluded_lower = [e.lower() for e in excluded_interventions]
+    if excluded_lower and interventions:
         for intervention in interventions:
-            if intervention.lower() in excluded_lower:
+            if intervention.casefold() in excluded_lower:
                 score -= 30
                 issues.append(f"Contains excluded intervention: {intervention}")
                 break
@@ -269,16 +321,13 @@ def _calculate_eligibility(
         explanation_parts.append("Accepts volunteers (may require specific condition)")
 
     # Determine status
-    if score >= 80:
-        status = EligibilityStatus.LIKELY_ELIGIBLE
-    elif score >= 60:
-        status = EligibilityStatus.POSSIBLY_ELIGIBLE
-    elif score >= 40:
-        status = EligibilityStatus.UNCLEAR
-    else:
-        status = EligibilityStatus.LIKELY_INELIGIBLE
+    status = _STATUS_BUCKETS[bisect.bisect_right(_STATUS_THRESHOLDS, score)]
 
-    # Build explanation
+    return score, status, explanation_parts, issues
+
+
+def _build_explanation(issues: list[str], explanation_parts: list[str]) -> str:
+    """Build the human-readable eligibility explanation for a match."""
     if issues:
         explanation = "Issues found: " + "; ".join(issues)
         if explanation_parts:
@@ -288,7 +337,7 @@ def _calculate_eligibility(
     else:
         explanation = "Unable to determine eligibility from available data"
 
-    return score, status, explanation, issues
+    return explanation
 
 
 def _parse_age(age_str: str) -> int | None:
@@ -315,11 +364,34 @@ def _parse_age(age_str: str) -> int | None:
     return None
 
 
-def _generate_next_steps(study: dict[str, Any], status: EligibilityStatus) -> list[str]:
-    """Generate next steps for a patient."""
-    steps = []
+def _unpack_study(study: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Pull the eligibility and contacts/locations modules out of a study in one pass."""
     protocol = study.get("protocolSection", {})
-    contacts = protocol.get("contactsLocationsModule", {})
+    return (
+        protocol.get("eligibilityModule", {}),
+        protocol.get("contactsLocationsModule", {}),
+    )
+
+
+def _nearest_site_km(
+    locations: list[dict[str, Any]],
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+) -> float | None:
+    """Distance to the closest geocoded site within radius_km, or None if there is none."""
+    points = [
+        (geo["lat"], geo["lon"])
+        for geo in (loc.get("geoPoint") for loc in locations)
+        if geo and geo.get("lat") is not None and geo.get("lon") is not None
+    ]
+    nearest = nearest_distance_km(points, latitude, longitude, radius_km)
+    return round(nearest, 1) if nearest is not None else None
+
+
+def _generate_next_steps(contacts: dict[str, Any], status: EligibilityStatus) -> list[str]:
+    """Generate next steps for a patient from the study's contacts/locations module."""
+    steps = []
 
     if status in (EligibilityStatus.LIKELY_ELIGIBLE, EligibilityStatus.POSSIBLY_ELIGIBLE):
         steps.append("Review the full eligibility criteria with your doctor")
@@ -1,16 +1,41 @@
 """Tool 1: search_clinical_trials - Intelligent trial discovery with natural language support."""
 
 import time
+from datetime import date
+from enum import Enum
 from typing import Any
 
 from core.api_client import get_api_client, APIError
 from core.pagination import PaginationHandler
 from core.essie_translator import get_translator
 from core.models import OverallStatus, Phase, StudyType, InterventionType
-from config import FIELDS_SUMMARY, DEFAULT_PAGE_SIZE
+from config import FIELDS_SUMMARY_JOINED, MAX_PAGE_SIZE
 from utils.metrics import extract_trial_summary, compute_trial_maturity, compute_enrollment_pace
 
 
+# API sort expressions for each supported sort_by value
+_SORT_MAPPING: dict[str, str] = {
+    "RELEVANCE": "@relevance",
+    "ENROLLMENT_COUNT": "EnrollmentCount:desc",
+    "LAST_UPDATE": "LastUpdatePostDate:desc",
+    "COMPLETION_DATE": "CompletionDate:desc",
+    "START_DATE": "StartDate:desc",
+}
+
+
+def _enum_lookup(enum_cls: type[Enum]) -> dict[str, str]:
+    """Map each member's name and value to its API value."""
+    return {m.name: m.value for m in enum_cls} | {m.value: m.value for m in enum_cls}
+
+
+# Enum normalization tables (upper-cased input -> API value). Dict lookups
+# replace constructing enums inside try/except on every call.
+_PHASE_NORMALIZE = _enum_lookup(Phase)
+_STATUS_NORMALIZE = _enum_lookup(OverallStatus)
+_STUDY_TYPES = _enum_lookup(StudyType)
+_INTERVENTION_TYPES = _enum_lookup(InterventionType)
+
+
 async def search_clinical_trials(
     query: str | None = None,
     disease_condition: str | None = None,
@@ -70,19 +95,21 @@ async def search_clinical_trials(
     Returns:
         Search results with trials, total count, and search metadata
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     client = get_api_client()
     translator = get_translator()
     pagination = PaginationHandler(client)
 
-    # Build query parameters
+    # Build query parameters. Essie filter clauses are collected in order and
+    # joined into filter.advanced once at the end.
     params: dict[str, Any] = {}
+    adv_parts: list[str] = []
 
     # Handle natural language query
     if query:
         translated = translator.translate(query)
         if "AREA[" in translated or "SEARCH[" in translated:
-            params["filter.advanced"] = translated
+            adv_parts.append(translated)
         else:
             params["query.term"] = query
 
@@ -94,56 +121,34 @@ async def search_clinical_trials(
     if intervention_name:
         params["query.intr"] = intervention_name
     elif intervention_type:
-        try:
-            InterventionType(intervention_type.upper())
+        intervention_type_upper = intervention_type.upper()
+        if intervention_type_upper in _INTERVENTION_TYPES:
             # Add to advanced filter if we have intervention type
-            filter_part = f"AREA[InterventionType]{intervention_type.upper()}"
-            if "filter.advanced" in params:
-                params["filter.advanced"] += f" AND {filter_part}"
-            else:
-                params["filter.advanced"] = filter_part
-        except ValueError:
-            pass
+            adv_parts.append(f"AREA[InterventionType]{intervention_type_upper}")
 
     # Handle phase filter
     if trial_phase:
         normalized_phases = []
         for p in trial_phase:
-            try:
-                phase = Phase(p.upper())
-                normalized_phases.append(phase.value)
-            except ValueError:
-                normalized_phases.append(p.upper())
-        
+            p_upper = p.upper()
+            normalized_phases.append(_PHASE_NORMALIZE.get(p_upper, p_upper))
+
         if normalized_phases:
-            phase_filter = "(" + " OR ".join(f"AREA[Phase]{p}" for p in normalized_phases) + ")"
-            if "filter.advanced" in params:
-                params["filter.advanced"] += f" AND {phase_filter}"
-            else:
-                params["filter.advanced"] = phase_filter
+            adv_parts.append("(" + " OR ".join(f"AREA[Phase]{p}" for p in normalized_phases) + ")")
 
     # Handle enrollment status
     if enrollment_status:
         normalized_status = []
         for s in enrollment_status:
-            try:
-                status = OverallStatus(s.upper())
-                normalized_status.append(status.value)
-            except ValueError:
-                normalized_status.append(s.upper())
+            s_upper = s.upper()
+            normalized_status.append(_STATUS_NORMALIZE.get(s_upper, s_upper))
         params["filter.overallStatus"] = "|".join(normalized_status)
 
     # Handle study type
     if study_type:
-        try:
-            st = StudyType(study_type.upper())
-            filter_part = f"AREA[StudyType]{st.value}"
-            if "filter.advanced" in params:
-                params["filter.advanced"] += f" AND {filter_part}"
-            else:
-                params["filter.advanced"] = filter_part
-        except ValueError:
-            pass
+        study_type_value = _STUDY_TYPES.get(study_type.upper())
+        if study_type_value:
+            adv_parts.append(f"AREA[StudyType]{study_type_value}")
 
     # Handle location filters
     if latitude is not None and longitude is not None:
@@ -159,11 +164,7 @@ async def search_clinical_trials(
             location_parts.append(f'AREA[LocationCountry]"{location_country}"')
         
         if location_parts:
-            location_filter = "SEARCH[Location](" + " AND ".join(location_parts) + ")"
-            if "filter.advanced" in params:
-                params["filter.advanced"] += f" AND {location_filter}"
-            else:
-                params["filter.advanced"] = location_filter
+            adv_parts.append("SEARCH[Location](" + " AND ".join(location_parts) + ")")
 
     # Handle eligibility criteria
     eligibility_parts = []
@@ -176,12 +177,7 @@ async def search_clinical_trials(
     if healthy_volunteers is not None:
         eligibility_parts.append(f'AREA[HealthyVolunteers]{"Yes" if healthy_volunteers else "No"}')
 
-    if eligibility_parts:
-        elig_filter = " AND ".join(eligibility_parts)
-        if "filter.advanced" in params:
-            params["filter.advanced"] += f" AND {elig_filter}"
-        else:
-            params["filter.advanced"] = elig_filter
+    adv_parts.extend(eligibility_parts)
 
     # Handle sponsor
     if sponsor:
@@ -189,40 +185,35 @@ async def search_clinical_trials(
 
     # Handle results filter
     if has_results is not None:
-        results_filter = f"AREA[HasResults]{'true' if has_results else 'false'}"
-        if "filter.advanced" in params:
-            params["filter.advanced"] += f" AND {results_filter}"
-        else:
-            params["filter.advanced"] = results_filter
+        adv_parts.append(f"AREA[HasResults]{'true' if has_results else 'false'}")
+
+    if adv_parts:
+        params["filter.advanced"] = " AND ".join(adv_parts)
 
     # Handle sorting
-    sort_mapping = {
-        "RELEVANCE": "@relevance",
-        "ENROLLMENT_COUNT": "EnrollmentCount:desc",
-        "LAST_UPDATE": "LastUpdatePostDate:desc",
-        "COMPLETION_DATE": "CompletionDate:desc",
-        "START_DATE": "StartDate:desc",
-    }
-    params["sort"] = sort_mapping.get(sort_by.upper(), "@relevance")
+    params["sort"] = _SORT_MAPPING.get(sort_by.upper(), "@relevance")
 
     # Handle fields
     if return_fields:
         params["fields"] = "|".join(return_fields)
     else:
-        params["fields"] = "|".join(FIELDS_SUMMARY)
+        params["fields"] = FIELDS_SUMMARY_JOINED
 
-    # Execute search
+    # Execute search. Pages are chained by nextPageToken and cannot be
+    # fetched concurrently, so request the whole result set in as few
+    # round trips as the API allows.
     try:
         response = await pagination.fetch_all_pages(
             query_params=params,
             max_results=min(results_limit, 1000),
-            page_size=min(DEFAULT_PAGE_SIZE, results_limit),
+            page_size=min(results_limit, MAX_PAGE_SIZE),
             count_total=True,
         )
 
         studies = response.get("studies", [])
         
-        # Process each study
+        # Process each study (one reference date for the whole batch)
+        today = date.today()
         processed_studies = []
         for study in studies:
             summary = extract_trial_summary(study)
@@ -230,12 +221,12 @@ async def search_clinical_trials(
             if include_metrics:
                 summary["computed_metrics"] = {
                     "trial_maturity": compute_trial_maturity(study),
-                    "enrollment_pace": compute_enrollment_pace(study),
+                    "enrollment_pace": compute_enrollment_pace(study, today=today),
                 }
             
             processed_studies.append(summary)
 
-        execution_time = (time.time() - start_time) * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e6
 
         return {
             "status": "SUCCESS",
@@ -248,7 +239,7 @@ async def search_clinical_trials(
         }
 
     except APIError as e:
-        execution_time = (time.time() - start_time) * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e6
         return {
             "status": "ERROR",
             "studies": [],
@@ -1,12 +1,20 @@
 """Tool 8: analyze_sponsor_network - Organization intelligence and pipeline analysis."""
 
+import heapq
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
 from typing import Any
 
 from core.api_client import get_api_client, APIError
 from core.pagination import PaginationHandler
 from core.models import AnalysisScope
-from config import FIELDS_STANDARD
-from utils.metrics import extract_trial_summary
+from config import FIELDS_STANDARD, MAX_PAGE_SIZE
+from utils.metrics import TrialRecord, extract_trial_record
+
+# Statuses counted as active for the sponsor summary and per therapeutic area
+_ACTIVE_STATUSES = frozenset({"RECRUITING", "ACTIVE_NOT_RECRUITING", "NOT_YET_RECRUITING"})
+_AREA_ACTIVE_STATUSES = frozenset({"RECRUITING", "ACTIVE_NOT_RECRUITING"})
+_NO_PHASE = ["N/A"]
 
 
 async def analyze_sponsor_network(
@@ -55,15 +63,16 @@ async def analyze_sponsor_network(
 
     # Time window filter
     if time_window_years:
-        from datetime import datetime, timedelta
         cutoff = datetime.now() - timedelta(days=time_window_years * 365)
         params["filter.advanced"] = f'AREA[StartDate]RANGE[{cutoff.strftime("%Y-%m-%d")},MAX]'
 
-    # Execute search
+    # Execute search. Pages are chained by nextPageToken and cannot be
+    # fetched concurrently, so size them to cover the limit in one request.
     try:
         response = await pagination.fetch_all_pages(
             query_params=params,
             max_results=limit,
+            page_size=min(limit, MAX_PAGE_SIZE),
             count_total=True,
         )
     except APIError as e:
@@ -84,42 +93,50 @@ async def analyze_sponsor_network(
             },
         }
 
-    # Process trials
-    trial_summaries = []
-    by_condition: dict[str, list[dict]] = {}
-    by_phase: dict[str, int] = {}
-    by_status: dict[str, int] = {}
-    collaborators: dict[str, int] = {}
+    # Process trials. Every aggregate, including the per-condition stats,
+    # is accumulated in this single pass.
+    trial_records: list[TrialRecord] = []
+    by_condition: defaultdict[str, dict[str, Any]] = defaultdict(
+        lambda: {"trial_count": 0, "total_enrollment": 0, "phases": Counter(), "active_count": 0}
+    )
+    by_phase: Counter[str] = Counter()
+    by_status: Counter[str] = Counter()
+    collaborators: Counter[str] = Counter()
     sponsor_class = None
     total_enrollment = 0
+    active_count = 0
 
     for study in studies:
-        summary = extract_trial_summary(study)
-        trial_summaries.append(summary)
+        record = extract_trial_record(study)
+        trial_records.append(record)
 
         # Get sponsor class
         if not sponsor_class:
-            sponsor_class = summary.get("sponsor_class")
+            sponsor_class = record.sponsor_class
 
         # Enrollment
-        enrollment = summary.get("enrollment") or 0
+        enrollment = record.enrollment or 0
         total_enrollment += enrollment
 
-        # By condition
-        conditions = summary.get("conditions") or []
-        for cond in conditions:
-            if cond not in by_condition:
-                by_condition[cond] = []
-            by_condition[cond].append(summary)
-
         # By phase
-        phases = summary.get("phase") or ["N/A"]
-        for phase in phases:
-            by_phase[phase] = by_phase.get(phase, 0) + 1
+        phases = record.phase or _NO_PHASE
+        by_phase.update(phases)
 
         # By status
-        status = summary.get("status", "Unknown")
-        by_status[status] = by_status.get(status, 0) + 1
+        status = record.status
+        by_status[status] += 1
+        if status in _ACTIVE_STATUSES:
+            active_count += 1
+        area_active = status in _AREA_ACTIVE_STATUSES
+
+        # By condition
+        for cond in record.conditions or ():
+            area = by_condition[cond]
+            area["trial_count"] += 1
+            area["total_enrollment"] += enrollment
+            area["phases"].update(phases)
+            if area_active:
+                area["active_count"] += 1
 
         # Collaborators (from full study data)
         protocol = study.get("protocolSection", {})
@@ -127,11 +144,10 @@ async def analyze_sponsor_network(
         for collab in sponsor_module.get("collaborators", []):
             collab_name = collab.get("name", "")
             if collab_name:
-                collaborators[collab_name] = collaborators.get(collab_name, 0) + 1
+                collaborators[collab_name] += 1
 
     # Build sponsor summary
-    active_count = sum(1 for s in trial_summaries if s.get("status") in ["RECRUITING", "ACTIVE_NOT_RECRUITING", "NOT_YET_RECRUITING"])
-    completed_count = by_status.get("COMPLETED", 0)
+    completed_count = by_status["COMPLETED"]
 
     sponsor_summary = {
         "name": sponsor_name,
@@ -151,59 +167,50 @@ async def analyze_sponsor_network(
     if include_trial_portfolio:
         result["trial_portfolio"] = [
             {
-                "nct_id": t["nct_id"],
-                "title": t["title"][:100],
-                "status": t["status"],
-                "phase": t.get("phase", []),
-                "conditions": t.get("conditions", [])[:2],
-                "enrollment": t.get("enrollment"),
-                "start_date": t.get("start_date"),
+                "nct_id": t.nct_id,
+                "title": t.title[:100],
+                "status": t.status,
+                "phase": t.phase,
+                "conditions": t.conditions[:2],
+                "enrollment": t.enrollment,
+                "start_date": t.start_date,
             }
-            for t in trial_summaries[:50]  # Limit to 50 for response size
+            for t in trial_records[:50]  # Limit to 50 for response size
         ]
 
     # Therapeutic area breakdown
     if analyze_therapeutic_areas:
-        therapeutic_areas = []
-        for cond, trials in sorted(by_condition.items(), key=lambda x: len(x[1]), reverse=True)[:15]:
-            phases_in_area = {}
-            total_area_enrollment = 0
-            for t in trials:
-                for p in t.get("phase") or ["N/A"]:
-                    phases_in_area[p] = phases_in_area.get(p, 0) + 1
-                total_area_enrollment += t.get("enrollment") or 0
-
-            therapeutic_areas.append({
+        top_areas = heapq.nlargest(15, by_condition.items(), key=lambda x: x[1]["trial_count"])
+        result["therapeutic_area_breakdown"] = [
+            {
                 "disease_area": cond,
-                "trial_count": len(trials),
-                "enrollment_focus": total_area_enrollment,
-                "phase_distribution": phases_in_area,
-                "active_count": sum(1 for t in trials if t.get("status") in ["RECRUITING", "ACTIVE_NOT_RECRUITING"]),
-            })
-
-        result["therapeutic_area_breakdown"] = therapeutic_areas
+                "trial_count": area["trial_count"],
+                "enrollment_focus": area["total_enrollment"],
+                "phase_distribution": dict(area["phases"]),
+                "active_count": area["active_count"],
+            }
+            for cond, area in top_areas
+        ]
 
     # Pipeline stage distribution
     if analyze_stage_distribution:
-        early_phase = by_phase.get("PHASE1", 0) + by_phase.get("EARLY_PHASE1", 0)
-        mid_phase = by_phase.get("PHASE2", 0)
-        late_phase = by_phase.get("PHASE3", 0) + by_phase.get("PHASE4", 0)
+        early_phase = by_phase["PHASE1"] + by_phase["EARLY_PHASE1"]
+        mid_phase = by_phase["PHASE2"]
+        late_phase = by_phase["PHASE3"] + by_phase["PHASE4"]
 
+        # Share thresholds (>50% early, >50% late, >40% mid) compared on the
+        # integer counts, so there are no divisions or float rounding at the edges
         total_phases = early_phase + mid_phase + late_phase
-        if total_phases > 0:
-            early_pct = early_phase / total_phases * 100
-            late_pct = late_phase / total_phases * 100
-
-            if early_pct > 50:
-                portfolio_strength = "Early-Heavy - Focus on discovery"
-            elif late_pct > 50:
-                portfolio_strength = "Late-Heavy - Near-term commercial potential"
-            elif mid_phase / total_phases > 0.4:
-                portfolio_strength = "Mid-Heavy - Proof of concept focus"
-            else:
-                portfolio_strength = "Balanced - Diversified pipeline"
-        else:
+        if total_phases == 0:
             portfolio_strength = "Unknown"
+        elif early_phase * 2 > total_phases:
+            portfolio_strength = "Early-Heavy - Focus on discovery"
+        elif late_phase * 2 > total_phases:
+            portfolio_strength = "Late-Heavy - Near-term commercial potential"
+        elif mid_phase * 5 > total_phases * 2:
+            portfolio_strength = "Mid-Heavy - Proof of concept focus"
+        else:
+            portfolio_strength = "Balanced - Diversified pipeline"
 
         result["pipeline_stage_distribution"] = {
             "early_phase": {
@@ -218,7 +225,7 @@ async def analyze_sponsor_network(
                 "phases": ["PHASE3", "PHASE4"],
                 "count": late_phase,
             },
-            "phase_breakdown": by_phase,
+            "phase_breakdown": dict(by_phase),
             "portfolio_strength": portfolio_strength,
         }
 
@@ -228,7 +235,7 @@ async def analyze_sponsor_network(
             "total_collaborators": len(collaborators),
             "top_collaborators": [
                 {"organization": k, "collaboration_count": v}
-                for k, v in sorted(collaborators.items(), key=lambda x: x[1], reverse=True)[:10]
+                for k, v in collaborators.most_common(10)
             ],
             "collaboration_intensity": "High" if len(collaborators) > 20 else "Moderate" if len(collaborators) > 5 else "Low",
         }
@@ -236,7 +243,7 @@ async def analyze_sponsor_network(
     # Add status distribution
     result["status_distribution"] = [
         {"status": k, "count": v}
-        for k, v in sorted(by_status.items(), key=lambda x: x[1], reverse=True)
+        for k, v in by_status.most_common()
     ]
 
     return result
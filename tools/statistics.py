@@ -1,11 +1,22 @@
 """Tool 10: query_trial_statistics - Aggregate analytics and trend analysis."""
 
+import heapq
+import statistics
+from collections import Counter
 from typing import Any
 
 from core.api_client import get_api_client, APIError
 from core.pagination import PaginationHandler
 from core.models import StatisticType
 
+# Field selections for each statistics query (pipe-joined for the API)
+_GEO_FIELDS = "NCTId|LocationCountry|LocationState|LocationCity|OverallStatus"
+_DISEASE_FIELDS = "NCTId|Condition|Phase|OverallStatus|EnrollmentCount"
+_ENROLLMENT_FIELDS = "NCTId|EnrollmentCount|Phase|OverallStatus|StudyType"
+
+# Statuses covered by DISEASE_LANDSCAPE when no status filter is given
+_DEFAULT_DISEASE_STATUSES = "RECRUITING|ACTIVE_NOT_RECRUITING|NOT_YET_RECRUITING|COMPLETED"
+
 
 async def query_trial_statistics(
     statistic_type: str,
@@ -74,7 +85,7 @@ async def query_trial_statistics(
     elif stat_type == StatisticType.GEOGRAPHIC_ANALYSIS:
         # Fetch trials and analyze by location
         params: dict[str, Any] = {
-            "fields": "NCTId|LocationCountry|LocationState|LocationCity|OverallStatus",
+            "fields": _GEO_FIELDS,
         }
 
         if condition:
@@ -89,8 +100,8 @@ async def query_trial_statistics(
                 count_total=True,
             )
 
-            by_country: dict[str, int] = {}
-            by_state: dict[str, int] = {}
+            by_country: Counter[str] = Counter()
+            by_state: Counter[str] = Counter()
 
             for study in response.get("studies", []):
                 protocol = study.get("protocolSection", {})
@@ -100,18 +111,18 @@ async def query_trial_statistics(
                     country = loc.get("country", "Unknown")
                     state = loc.get("state", "")
 
-                    by_country[country] = by_country.get(country, 0) + 1
+                    by_country[country] += 1
                     if state:
-                        by_state[f"{state}, {country}"] = by_state.get(f"{state}, {country}", 0) + 1
+                        by_state[f"{state}, {country}"] += 1
 
             result["geographic_distribution"] = {
                 "by_country": [
                     {"country": k, "trial_count": v}
-                    for k, v in sorted(by_country.items(), key=lambda x: x[1], reverse=True)[:limit]
+                    for k, v in by_country.most_common(limit)
                 ],
                 "by_state": [
                     {"location": k, "trial_count": v}
-                    for k, v in sorted(by_state.items(), key=lambda x: x[1], reverse=True)[:limit]
+                    for k, v in by_state.most_common(limit)
                 ],
             }
             result["total_trials_analyzed"] = response.get("totalCount", len(response.get("studies", [])))
@@ -122,12 +133,12 @@ async def query_trial_statistics(
 
     elif stat_type == StatisticType.DISEASE_LANDSCAPE:
         # Analyze conditions
-        params = {"fields": "NCTId|Condition|Phase|OverallStatus|EnrollmentCount"}
+        params = {"fields": _DISEASE_FIELDS}
 
         if enrollment_status:
             params["filter.overallStatus"] = "|".join(enrollment_status)
         elif not enrollment_status:
-            params["filter.overallStatus"] = "RECRUITING|ACTIVE_NOT_RECRUITING|NOT_YET_RECRUITING|COMPLETED"
+            params["filter.overallStatus"] = _DEFAULT_DISEASE_STATUSES
 
         try:
             response = await pagination.fetch_all_pages(
@@ -149,26 +160,25 @@ async def query_trial_statistics(
                         by_condition[cond] = {
                             "trial_count": 0,
                             "total_enrollment": 0,
-                            "phases": {},
+                            "phases": Counter(),
                         }
 
                     by_condition[cond]["trial_count"] += 1
                     by_condition[cond]["total_enrollment"] += enrollment or 0
 
-                    for phase in phases:
-                        by_condition[cond]["phases"][phase] = by_condition[cond]["phases"].get(phase, 0) + 1
+                    by_condition[cond]["phases"].update(phases)
 
-            # Sort by trial count
-            sorted_conditions = sorted(by_condition.items(), key=lambda x: x[1]["trial_count"], reverse=True)
+            # Top conditions by trial count
+            top_conditions = heapq.nlargest(limit, by_condition.items(), key=lambda x: x[1]["trial_count"])
 
             result["disease_landscape"] = [
                 {
                     "condition": k,
                     "trial_count": v["trial_count"],
                     "total_enrollment": v["total_enrollment"],
-                    "phase_distribution": v["phases"],
+                    "phase_distribution": dict(v["phases"]),
                 }
-                for k, v in sorted_conditions[:limit]
+                for k, v in top_conditions
             ]
             result["total_conditions_found"] = len(by_condition)
             result["visualization_suggestion"] = "treemap"
@@ -177,7 +187,7 @@ async def query_trial_statistics(
             return {"status": "ERROR", "message": str(e)}
 
     elif stat_type == StatisticType.ENROLLMENT_PATTERNS:
-        params = {"fields": "NCTId|EnrollmentCount|Phase|OverallStatus|StudyType"}
+        params = {"fields": _ENROLLMENT_FIELDS}
 
         if condition:
             params["query.cond"] = condition
@@ -191,8 +201,11 @@ async def query_trial_statistics(
                 count_total=True,
             )
 
-            enrollments = []
-            by_phase: dict[str, list[int]] = {}
+            # Enrollment column plus per-phase running count/total columns;
+            # by_phase only needs these aggregates, not each phase's values
+            enrollments: list[int] = []
+            phase_counts: Counter[str] = Counter()
+            phase_totals: Counter[str] = Counter()
 
             for study in response.get("studies", []):
                 protocol = study.get("protocolSection", {})
@@ -203,33 +216,37 @@ async def query_trial_statistics(
                 if enrollment and enrollment > 0:
                     enrollments.append(enrollment)
                     for phase in phases:
-                        if phase not in by_phase:
-                            by_phase[phase] = []
-                        by_phase[phase].append(enrollment)
+                        phase_counts[phase] += 1
+                        phase_totals[phase] += enrollment
 
             # Calculate statistics
             if enrollments:
-                sorted_e = sorted(enrollments)
+                # Linearly interpolated quartiles (same as numpy's default percentile)
+                if len(enrollments) > 1:
+                    p25, median, p75 = statistics.quantiles(enrollments, n=4, method="inclusive")
+                else:
+                    p25 = median = p75 = enrollments[0]
+
                 result["enrollment_patterns"] = {
                     "total_trials": len(enrollments),
                     "total_enrollment": sum(enrollments),
-                    "mean": round(sum(enrollments) / len(enrollments), 1),
-                    "median": sorted_e[len(sorted_e) // 2],
+                    "mean": round(statistics.fmean(enrollments), 1),
+                    "median": round(median, 1),
                     "min": min(enrollments),
                     "max": max(enrollments),
                     "percentiles": {
-                        "25th": sorted_e[len(sorted_e) // 4] if len(sorted_e) > 4 else sorted_e[0],
-                        "75th": sorted_e[3 * len(sorted_e) // 4] if len(sorted_e) > 4 else sorted_e[-1],
+                        "25th": round(p25, 1),
+                        "75th": round(p75, 1),
                     },
                 }
 
                 result["by_phase"] = {
                     phase: {
-                        "count": len(vals),
-                        "mean": round(sum(vals) / len(vals), 1) if vals else 0,
-                        "total": sum(vals),
+                        "count": count,
+                        "mean": round(phase_totals[phase] / count, 1),
+                        "total": phase_totals[phase],
                     }
-                    for phase, vals in by_phase.items()
+                    for phase, count in phase_counts.items()
                 }
 
             result["visualization_suggestion"] = "histogram"
@@ -246,9 +263,10 @@ async def query_trial_statistics(
         data = result.get("data", [])
         if data and len(data) > 1:
             top_value = data[0]
+            counts = [d.get("count", 0) for d in data]
             result["insights"] = {
                 "most_common": f"{top_value.get('value')} ({top_value.get('count')} occurrences)",
-                "concentration": f"Top {min(3, len(data))} values account for {sum(d.get('count', 0) for d in data[:3])} / {sum(d.get('count', 0) for d in data)} total",
+                "concentration": f"Top {min(3, len(data))} values account for {sum(counts[:3])} / {sum(counts)} total",
             }
 
     return result
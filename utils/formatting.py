@@ -1,7 +1,23 @@
 """Output formatting utilities for trial data."""
 
+import csv
+import io
 from typing import Any
 
+# (label, summary key, formatter) for fields shown in Markdown only when present
+_MARKDOWN_OPTIONAL_FIELDS = (
+    ("Conditions", "conditions", ", ".join),
+    ("Interventions", "interventions", ", ".join),
+    ("Enrollment", "enrollment", str),
+    ("Start Date", "start_date", str),
+    ("Expected Completion", "completion_date", str),
+    ("Locations", "locations", lambda locations: "; ".join(locations[:3])),
+)
+
+# Leading bullet and numbering characters stripped from eligibility criteria
+_BULLET_CHARS = "•-*·"
+_NUMBERING_CHARS = "0123456789."
+
 
 def format_trial_summary(trial: dict[str, Any]) -> str:
     """
@@ -13,25 +29,30 @@ def format_trial_summary(trial: dict[str, Any]) -> str:
     Returns:
         Formatted string
     """
+    get = trial.get
     lines = [
-        f"**{trial.get('nct_id', 'Unknown')}**: {trial.get('title', 'No Title')}",
-        f"- Status: {trial.get('status', 'Unknown')}",
-        f"- Phase: {', '.join(trial.get('phase', [])) or 'N/A'}",
-        f"- Sponsor: {trial.get('sponsor', 'Unknown')}",
+        f"**{get('nct_id', 'Unknown')}**: {get('title', 'No Title')}",
+        f"- Status: {get('status', 'Unknown')}",
+        f"- Phase: {', '.join(get('phase') or ()) or 'N/A'}",
+        f"- Sponsor: {get('sponsor', 'Unknown')}",
     ]
 
-    if trial.get("conditions"):
-        lines.append(f"- Conditions: {', '.join(trial['conditions'][:3])}")
+    conditions = get("conditions")
+    if conditions:
+        lines.append(f"- Conditions: {', '.join(conditions[:3])}")
 
-    if trial.get("interventions"):
-        lines.append(f"- Interventions: {', '.join(trial['interventions'][:3])}")
+    interventions = get("interventions")
+    if interventions:
+        lines.append(f"- Interventions: {', '.join(interventions[:3])}")
 
-    if trial.get("enrollment"):
-        lines.append(f"- Enrollment: {trial['enrollment']}")
+    enrollment = get("enrollment")
+    if enrollment:
+        lines.append(f"- Enrollment: {enrollment}")
 
-    if trial.get("locations"):
-        lines.append(f"- Locations: {trial['locations'][0]}" + (
-            f" (+{len(trial['locations'])-1} more)" if len(trial["locations"]) > 1 else ""
+    locations = get("locations")
+    if locations:
+        lines.append(f"- Locations: {locations[0]}" + (
+            f" (+{len(locations)-1} more)" if len(locations) > 1 else ""
         ))
 
     return "\n".join(lines)
@@ -48,39 +69,28 @@ def format_markdown(trials: list[dict[str, Any]], title: str = "Clinical Trials"
     Returns:
         Markdown formatted string
     """
-    lines = [f"# {title}", "", f"Found {len(trials)} trial(s).", ""]
+    buf = io.StringIO()
+    write = buf.write
+    write(f"# {title}\n\nFound {len(trials)} trial(s).\n")
 
     for i, trial in enumerate(trials, 1):
-        lines.append(f"## {i}. {trial.get('title', 'Unknown Trial')}")
-        lines.append("")
-        lines.append(f"**NCT ID:** {trial.get('nct_id', 'Unknown')}")
-        lines.append(f"**Status:** {trial.get('status', 'Unknown')}")
-        lines.append(f"**Phase:** {', '.join(trial.get('phase', [])) or 'N/A'}")
-        lines.append(f"**Sponsor:** {trial.get('sponsor', 'Unknown')}")
-
-        if trial.get("conditions"):
-            lines.append(f"**Conditions:** {', '.join(trial['conditions'])}")
-
-        if trial.get("interventions"):
-            lines.append(f"**Interventions:** {', '.join(trial['interventions'])}")
+        get = trial.get
+        write(
+            f"\n## {i}. {get('title', 'Unknown Trial')}\n"
+            f"\n**NCT ID:** {get('nct_id', 'Unknown')}"
+            f"\n**Status:** {get('status', 'Unknown')}"
+            f"\n**Phase:** {', '.join(get('phase') or ()) or 'N/A'}"
+            f"\n**Sponsor:** {get('sponsor', 'Unknown')}"
+        )
 
-        if trial.get("enrollment"):
-            lines.append(f"**Enrollment:** {trial['enrollment']}")
+        for label, key, fmt in _MARKDOWN_OPTIONAL_FIELDS:
+            value = get(key)
+            if value:
+                write(f"\n**{label}:** {fmt(value)}")
 
-        if trial.get("start_date"):
-            lines.append(f"**Start Date:** {trial['start_date']}")
+        write("\n\n---\n")
 
-        if trial.get("completion_date"):
-            lines.append(f"**Expected Completion:** {trial['completion_date']}")
-
-        if trial.get("locations"):
-            lines.append(f"**Locations:** {'; '.join(trial['locations'][:3])}")
-
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 def format_csv_row(trial: dict[str, Any], fields: list[str] | None = None) -> str:
@@ -97,18 +107,9 @@ def format_csv_row(trial: dict[str, Any], fields: list[str] | None = None) -> st
     if fields is None:
         fields = ["nct_id", "title", "status", "phase", "sponsor", "enrollment"]
 
-    values = []
-    for field in fields:
-        value = trial.get(field, "")
-        if isinstance(value, list):
-            value = "; ".join(str(v) for v in value)
-        # Escape quotes and wrap in quotes if contains comma
-        value = str(value).replace('"', '""')
-        if "," in value or '"' in value or "\n" in value:
-            value = f'"{value}"'
-        values.append(value)
-
-    return ",".join(values)
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow(_csv_values(trial, fields))
+    return buf.getvalue()[:-1]
 
 
 def format_csv(
@@ -128,12 +129,27 @@ def format_csv(
     if fields is None:
         fields = ["nct_id", "title", "status", "phase", "sponsor", "enrollment", "conditions"]
 
-    lines = [",".join(fields)]  # Header
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(fields)  # Header
+    writer.writerows(_csv_values(trial, fields) for trial in trials)
 
-    for trial in trials:
-        lines.append(format_csv_row(trial, fields))
+    return buf.getvalue()[:-1]
 
-    return "\n".join(lines)
+
+def _csv_values(trial: dict[str, Any], fields: list[str]) -> list[Any]:
+    """Cell values for one CSV row, with list fields joined by "; " and CR line breaks as LF."""
+    values = []
+    for field in fields:
+        value = trial.get(field, "")
+        if isinstance(value, list):
+            value = "; ".join(str(v) for v in value)
+        if isinstance(value, str) and "\r" in value:
+            # The writer only quotes on lineterminator characters, so a bare
+            # CR would end up unquoted in the middle of a row
+            value = value.replace("\r\n", "\n").replace("\r", "\n")
+        values.append(value)
+    return values
 
 
 def format_eligibility(eligibility_text: str) -> dict[str, list[str]]:
@@ -152,34 +168,33 @@ def format_eligibility(eligibility_text: str) -> dict[str, list[str]]:
     if not eligibility_text:
         return {"inclusion": inclusion, "exclusion": exclusion}
 
-    # Split into lines
-    lines = eligibility_text.split("\n")
-    current_section = "inclusion"
+    # Whole-text prefilter: without "inclusion"/"exclusion" anywhere there are
+    # no section headers, so skip lowercasing and checking each line
+    check_headers = "clusion" in eligibility_text.lower()
+    current = inclusion
 
-    for line in lines:
+    for line in eligibility_text.split("\n"):
         line = line.strip()
         if not line:
             continue
 
         # Check for section headers
-        lower_line = line.lower()
-        if "inclusion" in lower_line and ("criteria" in lower_line or ":" in line):
-            current_section = "inclusion"
-            continue
-        elif "exclusion" in lower_line and ("criteria" in lower_line or ":" in line):
-            current_section = "exclusion"
-            continue
+        if check_headers:
+            lower_line = line.lower()
+            if "inclusion" in lower_line and ("criteria" in lower_line or ":" in line):
+                current = inclusion
+                continue
+            elif "exclusion" in lower_line and ("criteria" in lower_line or ":" in line):
+                current = exclusion
+                continue
 
         # Add criterion to appropriate list
         # Clean up bullet points and numbering
-        line = line.lstrip("•-*·").strip()
-        line = line.lstrip("0123456789.").strip()
+        line = line.lstrip(_BULLET_CHARS).strip()
+        line = line.lstrip(_NUMBERING_CHARS).strip()
 
         if line:
-            if current_section == "inclusion":
-                inclusion.append(line)
-            else:
-                exclusion.append(line)
+            current.append(line)
 
     return {"inclusion": inclusion, "exclusion": exclusion}
 
@@ -0,0 +1,66 @@
+"""Geographic helpers for proximity-based trial matching."""
+
+import math
+from typing import Iterable
+
+EARTH_RADIUS_KM = 6371.0
+
+# Slightly under the true length of a degree of latitude (110.6-111.7 km), so
+# bounding boxes err on the side of being too large rather than clipping sites.
+KM_PER_DEGREE = 110.0
+
+
+def nearest_distance_km(
+    points: Iterable[tuple[float, float]],
+    center_lat: float,
+    center_lon: float,
+    radius_km: float,
+) -> float | None:
+    """
+    Find the distance to the closest point within a search circle.
+
+    Points outside the bounding box of the search circle are skipped without
+    any trigonometry; the rest are measured with the haversine formula. The
+    box bounds and the center's trigonometric terms are computed once for the
+    whole batch instead of once per point.
+
+    Args:
+        points: (latitude, longitude) pairs in degrees
+        center_lat: Circle center latitude in degrees
+        center_lon: Circle center longitude in degrees
+        radius_km: Circle radius in kilometers
+
+    Returns:
+        Distance in kilometers to the nearest point within radius_km, or None
+    """
+    dlat, dlon = _bbox_half_widths(center_lat, radius_km)
+    phi0 = math.radians(center_lat)
+    cos_phi0 = math.cos(phi0)
+    radians, sin, cos = math.radians, math.sin, math.cos
+
+    nearest = None
+    for lat, lon in points:
+        if abs(lat - center_lat) > dlat:
+            continue
+        delta_lon = (lon - center_lon + 180.0) % 360.0 - 180.0
+        if dlon is not None and abs(delta_lon) > dlon:
+            continue
+
+        phi = radians(lat)
+        a = sin((phi - phi0) / 2) ** 2 + cos_phi0 * cos(phi) * sin(radians(delta_lon) / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+        if distance <= radius_km and (nearest is None or distance < nearest):
+            nearest = distance
+
+    return nearest
+
+
+def _bbox_half_widths(center_lat: float, radius_km: float) -> tuple[float, float | None]:
+    """Latitude and longitude half-widths in degrees (None = no longitude bound)."""
+    dlat = radius_km / KM_PER_DEGREE
+
+    # Use the box edge closest to a pole, where degrees of longitude are shortest
+    edge_cos = math.cos(math.radians(min(90.0, abs(center_lat) + dlat)))
+    if edge_cos <= 0 or radius_km >= edge_cos * KM_PER_DEGREE * 180:
+        return dlat, None
+    return dlat, radius_km / (KM_PER_DEGREE * edge_cos)
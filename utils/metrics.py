@@ -1,7 +1,141 @@
 """Utility functions for computing trial metrics."""
 
-from datetime import datetime, date
-from typing import Any
+import functools
+import sys
+import time
+from datetime import date
+from typing import Any, Iterable, NamedTuple
+
+from config import CACHE_MAX_DATES
+
+# Maturity for trials whose phase doesn't decide it
+_MATURITY_BY_STATUS: dict[str, str] = {
+    "NOT_YET_RECRUITING": "EARLY",
+    "RECRUITING": "EARLY",
+    "ACTIVE_NOT_RECRUITING": "MID",
+    "ENROLLING_BY_INVITATION": "MID",
+    "COMPLETED": "LATE",
+    "TERMINATED": "LATE",
+    "SUSPENDED": "LATE",
+    "WITHDRAWN": "LATE",
+}
+
+# Statuses of trials that are still running (excludes NOT_YET_RECRUITING)
+_RUNNING_STATUSES = frozenset({"RECRUITING", "ACTIVE_NOT_RECRUITING", "ENROLLING_BY_INVITATION"})
+
+# Statuses of trials that will not run any further
+_ENDED_STATUSES = frozenset({"COMPLETED", "TERMINATED", "WITHDRAWN"})
+
+# Enrollment pace thresholds in days (30-day months), keyed by the phase that
+# sets the expected duration (Phase 1: ~1 year, Phase 2: ~2 years, Phase 3:
+# ~3 years): early stage below 30% of it, on track below 70%, approaching
+# completion past 80%
+_PACE_TABLE: dict[str | None, tuple[int, int, int]] = {
+    key: (months * 9, months * 21, months * 24)
+    for key, months in (("PHASE3", 36), ("PHASE2", 24), (None, 12))
+}
+
+# Completion likelihood for trials that aren't actively running
+_LIKELIHOOD_BY_STATUS: dict[str, str] = {
+    "COMPLETED": "Completed",
+    "TERMINATED": "Did Not Complete",
+    "WITHDRAWN": "Did Not Complete",
+    "SUSPENDED": "Low - Suspended",
+    "NOT_YET_RECRUITING": "Medium - Not Yet Started",
+}
+
+# Completion likelihood for running trials, by the earliest phase covered, from
+# historical completion rates (approximate): Phase 1 ~60%, Phase 2 ~35%,
+# Phase 3 ~25%
+_LIKELIHOOD_BY_PHASE: tuple[tuple[str, str], ...] = (
+    ("PHASE1", "Medium - Phase 1"),
+    ("EARLY_PHASE1", "Medium - Phase 1"),
+    ("PHASE2", "Medium-Low - Phase 2"),
+    ("PHASE3", "Medium - Phase 3"),
+    ("PHASE4", "High - Phase 4"),
+)
+
+
+def _dig(data: dict[str, Any], *path: str, default: Any = None) -> Any:
+    """Follow nested keys through a study dict, returning default at the first missing one."""
+    for key in path:
+        data = data.get(key)
+        if data is None:
+            return default
+    return data
+
+
+def _extract_phases(protocol: dict[str, Any]) -> frozenset[str]:
+    """Upper-cased phase tokens from a protocol section (a list or a single string)."""
+    phase_list = _dig(protocol, "designModule", "phases")
+    if isinstance(phase_list, list):
+        return frozenset(sys.intern(p.upper()) for p in phase_list)
+    elif isinstance(phase_list, str):
+        return frozenset((sys.intern(phase_list.upper()),))
+    return frozenset()
+
+
+class _TrialView(NamedTuple):
+    """
+    Study sections and normalized fields shared by the metric functions.
+
+    The status and phase tokens are interned, so lookups in the status and
+    phase tables can match on identity.
+    """
+
+    status_module: dict[str, Any]
+    design_module: dict[str, Any]
+    status: str
+    phases: frozenset[str]
+
+
+def _view(trial: dict[str, Any]) -> _TrialView:
+    """Build the _TrialView for a trial."""
+    protocol = trial.get("protocolSection", {})
+    status_module = protocol.get("statusModule", {})
+    return _TrialView(
+        status_module=status_module,
+        design_module=protocol.get("designModule", {}),
+        status=sys.intern(status_module.get("overallStatus", "").upper()),
+        phases=_extract_phases(protocol),
+    )
+
+
+@functools.lru_cache(maxsize=CACHE_MAX_DATES)
+def _parse_partial_date(value: str) -> date | None:
+    """Parse a "YYYY-MM-DD", "YYYY-MM" or "YYYY" date (missing parts default to 1), or None."""
+    # Validate the layout up front rather than relying on exceptions, so
+    # malformed values (whose results are cached too) are a cheap None
+    length = len(value)
+    if length not in (4, 7, 10) or not (value.isascii() and value.replace("-", "").isdigit()):
+        return None
+    if length > 4 and (value[4] != "-" or (length == 10 and value[7] != "-")):
+        return None
+
+    try:
+        if length == 10:
+            return date.fromisoformat(value)
+        if length == 7:
+            return date(int(value[0:4]), int(value[5:7]), 1)
+        return date(int(value), 1, 1)
+    except ValueError:
+        # Well-formed but out of range, e.g. month 13
+        return None
+
+
+# (monotonic time of last clock read, date it returned)
+_today_cache: tuple[float, date] = (float("-inf"), date.min)
+
+
+def _today() -> date:
+    """date.today(), re-read from the wall clock at most once a minute."""
+    global _today_cache
+    checked_at, today = _today_cache
+    now = time.monotonic()
+    if now - checked_at >= 60:
+        today = date.today()
+        _today_cache = (now, today)
+    return today
 
 
 def compute_trial_maturity(trial: dict[str, Any]) -> str:
@@ -19,44 +153,47 @@ def compute_trial_maturity(trial: dict[str, Any]) -> str:
     Returns:
         "EARLY", "MID", or "LATE"
     """
-    # Extract phase
-    phases = []
-    protocol = trial.get("protocolSection", {})
-    design_module = protocol.get("designModule", {})
-    phase_list = design_module.get("phases", [])
-    if isinstance(phase_list, list):
-        phases = [p.upper() for p in phase_list]
-    elif isinstance(phase_list, str):
-        phases = [phase_list.upper()]
+    # Extract phase and status
+    _, _, status, phases = _view(trial)
 
-    # Extract status
-    status_module = protocol.get("statusModule", {})
-    status = status_module.get("overallStatus", "").upper()
-
-    # Check for late stage indicators
-    if "PHASE4" in phases or status == "COMPLETED":
+    # Checks are ordered so the common cases exit first without changing
+    # precedence: completed trials (about half the registry) are LATE whatever
+    # their phase, and observational studies (no phases) skip the phase tests
+    if status == "COMPLETED":
         return "LATE"
 
-    # Check for mid stage
-    if "PHASE2" in phases or "PHASE3" in phases:
-        return "MID"
+    if phases:
+        # Check for late stage indicators
+        if "PHASE4" in phases:
+            return "LATE"
 
-    # Check for early stage
-    if "PHASE1" in phases or "EARLY_PHASE1" in phases:
-        return "EARLY"
+        # Check for mid stage
+        if "PHASE2" in phases or "PHASE3" in phases:
+            return "MID"
+
+        # Check for early stage
+        if "PHASE1" in phases or "EARLY_PHASE1" in phases:
+            return "EARLY"
 
     # Default based on status
-    if status in ("NOT_YET_RECRUITING", "RECRUITING"):
-        return "EARLY"
-    elif status in ("ACTIVE_NOT_RECRUITING", "ENROLLING_BY_INVITATION"):
-        return "MID"
-    elif status in ("COMPLETED", "TERMINATED", "SUSPENDED", "WITHDRAWN"):
-        return "LATE"
+    return _MATURITY_BY_STATUS.get(status, "EARLY")
 
-    return "EARLY"
 
+def _classify_pace(days_since_start: int, thresholds: tuple[int, int, int]) -> str:
+    """Pace label for a started trial, given its _PACE_TABLE thresholds."""
+    early_end, on_track_end, approaching_after = thresholds
+    if days_since_start < 90:  # Under 3 months
+        return "Recently Started"
+    if days_since_start > approaching_after:
+        return "Approaching Completion"
+    if days_since_start < early_end:
+        return "Early Stage"
+    if days_since_start < on_track_end:
+        return "On Track"
+    return "Nearing Target"
 
-def compute_enrollment_pace(trial: dict[str, Any]) -> str:
+
+def compute_enrollment_pace(trial: dict[str, Any], *, today: date | None = None) -> str:
     """
     Compute enrollment pace assessment.
 
@@ -67,16 +204,15 @@ def compute_enrollment_pace(trial: dict[str, Any]) -> str:
 
     Args:
         trial: Trial data dictionary
+        today: Reference date (defaults to the current date)
 
     Returns:
         Description of enrollment pace ("Fast", "On Track", "Slow", "Unknown")
     """
-    protocol = trial.get("protocolSection", {})
-    design_module = protocol.get("designModule", {})
-    status_module = protocol.get("statusModule", {})
+    view = _view(trial)
 
     # Get enrollment info
-    enrollment_info = design_module.get("enrollmentInfo", {})
+    enrollment_info = view.design_module.get("enrollmentInfo", {})
     target = enrollment_info.get("count")
     enrollment_type = enrollment_info.get("type", "").upper()
 
@@ -84,60 +220,29 @@ def compute_enrollment_pace(trial: dict[str, Any]) -> str:
         return "Unknown"
 
     # Get start date
-    start_struct = status_module.get("startDateStruct", {})
-    start_date_str = start_struct.get("date")
+    start_date_str = _dig(view.status_module, "startDateStruct", "date")
 
     if not start_date_str:
         return "Unknown"
 
-    try:
-        # Parse start date (format: "YYYY-MM-DD" or "YYYY-MM" or "YYYY")
-        if len(start_date_str) == 10:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-        elif len(start_date_str) == 7:
-            start_date = datetime.strptime(start_date_str + "-01", "%Y-%m-%d").date()
-        else:
-            start_date = datetime.strptime(start_date_str + "-01-01", "%Y-%m-%d").date()
-
-        days_since_start = (date.today() - start_date).days
-
-        if days_since_start <= 0:
-            return "Not Started"
-
-        # Estimate expected months based on typical trial duration
-        # Phase 1: ~1 year, Phase 2: ~2 years, Phase 3: ~3 years
-        phases = design_module.get("phases", [])
-        if "PHASE3" in phases:
-            expected_months = 36
-        elif "PHASE2" in phases:
-            expected_months = 24
-        else:
-            expected_months = 12
-
-        expected_per_month = target / expected_months
-        months_elapsed = days_since_start / 30
-
-        if enrollment_type == "ACTUAL":
-            # If we have actual enrollment data (not common in active trials)
-            return "Completed Enrollment"
-
-        # Estimate pace based on time elapsed
-        if months_elapsed < 3:
-            return "Recently Started"
-        elif months_elapsed > expected_months * 0.8:
-            return "Approaching Completion"
-        else:
-            progress_pct = (months_elapsed / expected_months) * 100
-            if progress_pct < 30:
-                return "Early Stage"
-            elif progress_pct < 70:
-                return "On Track"
-            else:
-                return "Nearing Target"
-
-    except (ValueError, TypeError):
+    # Parse start date (format: "YYYY-MM-DD" or "YYYY-MM" or "YYYY")
+    start_date = _parse_partial_date(start_date_str)
+    if start_date is None:
         return "Unknown"
 
+    days_since_start = ((today or _today()) - start_date).days
+
+    if days_since_start <= 0:
+        return "Not Started"
+
+    if enrollment_type == "ACTUAL":
+        # If we have actual enrollment data (not common in active trials)
+        return "Completed Enrollment"
+
+    phases = view.phases
+    pace_key = "PHASE3" if "PHASE3" in phases else "PHASE2" if "PHASE2" in phases else None
+    return _classify_pace(days_since_start, _PACE_TABLE[pace_key])
+
 
 def compute_completion_likelihood(trial: dict[str, Any]) -> str:
     """
@@ -154,116 +259,99 @@ def compute_completion_likelihood(trial: dict[str, Any]) -> str:
     Returns:
         Likelihood assessment ("High", "Medium", "Low", "Completed", "N/A")
     """
-    protocol = trial.get("protocolSection", {})
-    status_module = protocol.get("statusModule", {})
-    status = status_module.get("overallStatus", "").upper()
-
-    # Already completed or terminated
-    if status == "COMPLETED":
-        return "Completed"
-    elif status in ("TERMINATED", "WITHDRAWN"):
-        return "Did Not Complete"
-    elif status == "SUSPENDED":
-        return "Low - Suspended"
+    _, _, status, phases = _view(trial)
 
     # Active trials
-    if status in ("RECRUITING", "ACTIVE_NOT_RECRUITING", "ENROLLING_BY_INVITATION"):
+    if status in _RUNNING_STATUSES:
         # Get phase for historical completion rates
-        design_module = protocol.get("designModule", {})
-        phases = design_module.get("phases", [])
-
-        # Historical completion rates by phase (approximate)
-        # Phase 1: ~60%, Phase 2: ~35%, Phase 3: ~25%
-        if "PHASE1" in phases or "EARLY_PHASE1" in phases:
-            return "Medium - Phase 1"
-        elif "PHASE2" in phases:
-            return "Medium-Low - Phase 2"
-        elif "PHASE3" in phases:
-            return "Medium - Phase 3"
-        elif "PHASE4" in phases:
-            return "High - Phase 4"
-        else:
-            return "Medium"
+        for phase, likelihood in _LIKELIHOOD_BY_PHASE:
+            if phase in phases:
+                return likelihood
+        return "Medium"
 
-    elif status == "NOT_YET_RECRUITING":
-        return "Medium - Not Yet Started"
+    # Finished, stopped or not yet started
+    return _LIKELIHOOD_BY_STATUS.get(status, "Unknown")
 
-    return "Unknown"
 
-
-def compute_days_since_start(trial: dict[str, Any]) -> int | None:
+def compute_days_since_start(trial: dict[str, Any], *, today: date | None = None) -> int | None:
     """
     Compute days since trial started.
 
     Args:
         trial: Trial data dictionary
+        today: Reference date (defaults to the current date)
 
     Returns:
         Number of days since start, or None if not available
     """
-    protocol = trial.get("protocolSection", {})
-    status_module = protocol.get("statusModule", {})
-    start_struct = status_module.get("startDateStruct", {})
-    start_date_str = start_struct.get("date")
+    start_date_str = _dig(_view(trial).status_module, "startDateStruct", "date")
 
     if not start_date_str:
         return None
 
-    try:
-        if len(start_date_str) == 10:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-        elif len(start_date_str) == 7:
-            start_date = datetime.strptime(start_date_str + "-01", "%Y-%m-%d").date()
-        else:
-            start_date = datetime.strptime(start_date_str + "-01-01", "%Y-%m-%d").date()
-
-        return (date.today() - start_date).days
-    except (ValueError, TypeError):
+    start_date = _parse_partial_date(start_date_str)
+    if start_date is None:
         return None
+    return ((today or _today()) - start_date).days
 
 
-def compute_days_to_completion(trial: dict[str, Any]) -> int | None:
+def compute_days_to_completion(trial: dict[str, Any], *, today: date | None = None) -> int | None:
     """
     Compute estimated days until completion.
 
     Args:
         trial: Trial data dictionary
+        today: Reference date (defaults to the current date)
 
     Returns:
         Number of days to completion, or None if not available/already completed
     """
-    protocol = trial.get("protocolSection", {})
-    status_module = protocol.get("statusModule", {})
+    status_module, _, status, _ = _view(trial)
 
     # Check if already completed
-    status = status_module.get("overallStatus", "").upper()
-    if status in ("COMPLETED", "TERMINATED", "WITHDRAWN"):
+    if status in _ENDED_STATUSES:
         return 0
 
     # Get completion date
-    comp_struct = status_module.get("completionDateStruct", {})
-    comp_date_str = comp_struct.get("date")
+    comp_date_str = _dig(status_module, "completionDateStruct", "date")
 
     if not comp_date_str:
         # Try primary completion date
-        comp_struct = status_module.get("primaryCompletionDateStruct", {})
-        comp_date_str = comp_struct.get("date")
+        comp_date_str = _dig(status_module, "primaryCompletionDateStruct", "date")
 
     if not comp_date_str:
         return None
 
-    try:
-        if len(comp_date_str) == 10:
-            comp_date = datetime.strptime(comp_date_str, "%Y-%m-%d").date()
-        elif len(comp_date_str) == 7:
-            comp_date = datetime.strptime(comp_date_str + "-01", "%Y-%m-%d").date()
-        else:
-            comp_date = datetime.strptime(comp_date_str + "-01-01", "%Y-%m-%d").date()
-
-        days = (comp_date - date.today()).days
-        return max(0, days)  # Return 0 if past due
-    except (ValueError, TypeError):
+    comp_date = _parse_partial_date(comp_date_str)
+    if comp_date is None:
         return None
+    days = (comp_date - (today or _today())).days
+    return max(0, days)  # Return 0 if past due
+
+
+def compute_all_metrics(trial: dict[str, Any], *, today: date | None = None) -> dict[str, Any]:
+    """
+    Compute every per-trial metric in one call.
+
+    The metrics share one reference date, so they agree even when the call
+    straddles midnight.
+
+    Args:
+        trial: Trial data dictionary
+        today: Reference date (defaults to the current date)
+
+    Returns:
+        Dictionary of trial_maturity, enrollment_pace, completion_likelihood,
+        days_since_start and days_to_completion
+    """
+    today = today or _today()
+    return {
+        "trial_maturity": compute_trial_maturity(trial),
+        "enrollment_pace": compute_enrollment_pace(trial, today=today),
+        "completion_likelihood": compute_completion_likelihood(trial),
+        "days_since_start": compute_days_since_start(trial, today=today),
+        "days_to_completion": compute_days_to_completion(trial, today=today),
+    }
 
 
 def extract_trial_summary(trial: dict[str, Any]) -> dict[str, Any]:
@@ -280,31 +368,28 @@ def extract_trial_summary(trial: dict[str, Any]) -> dict[str, Any]:
     id_module = protocol.get("identificationModule", {})
     status_module = protocol.get("statusModule", {})
     design_module = protocol.get("designModule", {})
-    sponsor_module = protocol.get("sponsorCollaboratorsModule", {})
-    conditions_module = protocol.get("conditionsModule", {})
-    arms_module = protocol.get("armsInterventionsModule", {})
-    contacts_module = protocol.get("contactsLocationsModule", {})
+    lead_sponsor = protocol.get("sponsorCollaboratorsModule", {}).get("leadSponsor", {})
 
     # Extract interventions
     interventions = []
-    for arm in arms_module.get("interventions", []):
+    for arm in protocol.get("armsInterventionsModule", {}).get("interventions", []):
         name = arm.get("name")
         if name:
             interventions.append(name)
 
     # Extract conditions
-    conditions = conditions_module.get("conditions", [])
+    conditions = protocol.get("conditionsModule", {}).get("conditions", [])
 
     # Extract locations
     locations = []
-    for loc in contacts_module.get("locations", [])[:5]:  # Limit to 5
+    for loc in protocol.get("contactsLocationsModule", {}).get("locations", [])[:5]:  # Limit to 5
         parts = []
-        if loc.get("city"):
-            parts.append(loc["city"])
-        if loc.get("state"):
-            parts.append(loc["state"])
-        if loc.get("country"):
-            parts.append(loc["country"])
+        if city := loc.get("city"):
+            parts.append(city)
+        if state := loc.get("state"):
+            parts.append(state)
+        if country := loc.get("country"):
+            parts.append(country)
         if parts:
             locations.append(", ".join(parts))
 
@@ -320,8 +405,8 @@ def extract_trial_summary(trial: dict[str, Any]) -> dict[str, Any]:
         "study_type": design_module.get("studyType", ""),
         "conditions": conditions,
         "interventions": interventions,
-        "sponsor": sponsor_module.get("leadSponsor", {}).get("name", ""),
-        "sponsor_class": sponsor_module.get("leadSponsor", {}).get("class", ""),
+        "sponsor": lead_sponsor.get("name", ""),
+        "sponsor_class": lead_sponsor.get("class", ""),
         "enrollment": enrollment_info.get("count"),
         "enrollment_type": enrollment_info.get("type", ""),
         "start_date": status_module.get("startDateStruct", {}).get("date"),
@@ -329,3 +414,63 @@ def extract_trial_summary(trial: dict[str, Any]) -> dict[str, Any]:
         "locations": locations,
         "has_results": trial.get("hasResults", False),
     }
+
+
+class TrialRecord(NamedTuple):
+    """
+    Tuple form of extract_trial_summary's fields for aggregation loops.
+
+    A named tuple rather than a frozen dataclass: a tuple is built in C
+    instead of one object.__setattr__ call per field, and batches of records
+    transpose into columns with zip().
+    """
+
+    nct_id: str
+    title: str
+    official_title: str
+    status: str
+    phase: list[str]
+    study_type: str
+    conditions: list[str]
+    interventions: list[str]
+    sponsor: str
+    sponsor_class: str
+    enrollment: int | None
+    enrollment_type: str
+    start_date: str | None
+    completion_date: str | None
+    locations: list[str]
+    has_results: bool
+
+
+def extract_trial_record(trial: dict[str, Any]) -> TrialRecord:
+    """
+    Extract key trial information as a TrialRecord.
+
+    Args:
+        trial: Full trial data dictionary
+
+    Returns:
+        TrialRecord with the same fields as extract_trial_summary
+    """
+    return TrialRecord(**extract_trial_summary(trial))
+
+
+def extract_trial_columns(trials: Iterable[dict[str, Any]]) -> dict[str, list[Any]]:
+    """
+    Extract summaries for a batch of trials in column-oriented form.
+
+    Aggregation loops that only read a few summary fields can walk these
+    columns directly instead of building and indexing a dictionary per trial.
+
+    Args:
+        trials: Full trial data dictionaries
+
+    Returns:
+        Dictionary mapping each extract_trial_summary field to a list holding
+        that field's value for every trial, in input order
+    """
+    records = [extract_trial_record(trial) for trial in trials]
+    if not records:
+        return {name: [] for name in TrialRecord._fields}
+    return dict(zip(TrialRecord._fields, map(list, zip(*records))))